@@ -1,15 +1,45 @@
 #!/usr/bin/env python3
+import asyncio
 import requests
-from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Optional: falls back to a thread pool for fetching
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: stdlib json is used when unavailable
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None  # Optional: sanity check falls back to per-code scans
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional: without it we only advertise gzip/deflate
 import sys
 import os
 import csv
+import gzip
+import zlib
+import hashlib
 import re
 import time
 import json
+from pathlib import Path
 from urllib.parse import urlparse
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml.cssselect import CSSSelector
 import openai
 
 # Load environment variables from .env file
@@ -25,10 +55,182 @@ MAX_PRODUCTS = int(os.getenv('MAX_PRODUCTS', '0'))
 DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'  # Add debug flag
 FORCE_MODE = os.getenv('FORCE_MODE', 'false').lower() == 'true'  # Force processing of all codes in CSV
 
+# Browser-like User-Agent used for all page fetches
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Number of product pages allowed in flight at once
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '16'))
+
+# Product-page request rate budget (0 = unlimited)
+REQUESTS_PER_SECOND = float(os.getenv('REQUESTS_PER_SECOND', '10'))
+
+# Worker processes for HTML parsing (0 = parse in threads). Processes
+# sidestep the GIL entirely but pay to pickle each page across the
+# boundary, so they only win on many-core machines with big catalogs
+PARSE_PROCESSES = int(os.getenv('PARSE_PROCESSES', '0'))
+
+# Probe product URLs with a bodyless HEAD request before the full GET; worth
+# enabling when many input codes are expected to be dead (e.g. FORCE_MODE
+# with guessed URLs), since it spends an extra round trip per live page
+HEAD_PRECHECK = os.getenv('HEAD_PRECHECK', 'false').lower() == 'true'
+
+# Directory for cached product-page HTML; reruns read from here instead of
+# re-downloading unchanged pages
+CACHE_DIR = Path(os.getenv('CACHE_DIR', 'cache'))
+
+# Seconds before a cached page is revalidated with a conditional GET
+# (0 = trust cached pages forever)
+CACHE_MAX_AGE = int(os.getenv('CACHE_MAX_AGE', '86400'))
+
+# Shared HTTP session: pooled keep-alive connections avoid a new TCP+TLS
+# handshake per request, and urllib3 retries transient failures for us.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+SESSION.headers['User-Agent'] = USER_AGENT
+# Ask for compressed responses; sitemap XML typically shrinks ~10x over the
+# wire and requests decodes it transparently. Only advertise brotli when the
+# decoder is importable.
+SESSION.headers['Accept-Encoding'] = (
+    'gzip, deflate, br' if brotli is not None else 'gzip, deflate')
+
+# Clark-notation tags/paths for the sitemap elements we work with; hoisting
+# these avoids per-element prefix resolution through a namespaces dict
+SITEMAP_URL_TAG = '{http://www.sitemaps.org/schemas/sitemap/0.9}url'
+SITEMAP_SITEMAP_TAG = '{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap'
+SITEMAP_LOC_TAG = '{http://www.sitemaps.org/schemas/sitemap/0.9}loc'
+IMAGE_LOC_PATH = './/{http://www.google.com/schemas/sitemap-image/1.1}loc'
+IMAGE_CAPTION_PATH = './/{http://www.google.com/schemas/sitemap-image/1.1}caption'
+
+# Markdown constructs to strip from model output, fused into one alternation
+# so the text is scanned once instead of once per construct
+_MD_SUB = re.compile(
+    r'#{1,6}\s+'
+    r'|\*\*(.+?)\*\*'
+    r'|\*(.+?)\*'
+    r'|__(.+?)__'
+    r'|_(.+?)_'
+    r'|\[(.+?)\]\(.+?\)'
+)
+
+# Product-code patterns used when parsing sitemap URLs and names
+_PRODUCT_SLUG = re.compile(r'/products/([^/?#]+)')
+_CODE_TAIL = re.compile(r'\d+$')
+_CODE_DASH = re.compile(r'-(\d+)(?:-|$)')
+_CODE_PAREN = re.compile(r'[-(](\d+)[)-]')
+
+
+def _json_loads(data):
+    """Parse JSON with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        # orjson rejects str subclasses like lxml's _ElementUnicodeResult
+        if isinstance(data, str) and type(data) is not str:
+            data = str(data)
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_indented(obj):
+    """Serialize JSON with two-space indentation (used in LLM prompts)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _md_repl(match):
+    """Replace a matched markdown construct with its inner text (if any)."""
+    for group in match.groups():
+        if group is not None:
+            return group
+    return ''
+
+
+# CSS selectors for product-page content. Each category is fused into one
+# combined selector compiled at import, so finding a match is a single tree
+# walk instead of one walk per candidate selector.
+DESC_SEL = CSSSelector(', '.join((
+    '.product-single__description',
+    '.product__description',
+    '.product-description',
+    '.description',
+    '[itemprop="description"]',
+    '.product-detail',
+)))
+
+SPEC_SEL = CSSSelector(', '.join((
+    '.product-single__specs-table',
+    '.specs-table',
+    '.product-specs',
+    '.specifications',
+    'table.specs',
+    '[itemprop="additionalProperty"]',
+)))
+
+SET_ITEMS_SEL = CSSSelector(', '.join((
+    '.product-single__set-items',
+    '.set-items',
+    '.product-set',
+    '.package-contents',
+    '.included-items',
+)))
+
+_TR_SEL = CSSSelector('tr')
+_TD_SEL = CSSSelector('td')
+_SET_ITEM_SEL = CSSSelector('.set-item, .item')
+_SET_ITEM_NAME_SEL = CSSSelector('.set-item__name, .item-name, .name')
+_PRODUCT_INFO_SEL = CSSSelector('.product-info, .product-details, .product-information, .product-data')
+
+# Returns the raw text of JSON-LD script blocks directly, no element hop
+_JSONLD_TEXT_XPATH = etree.XPath('//script[@type="application/ld+json"]/text()')
+
+# Shared HTML parser: dropping comments and blank text up front shrinks the
+# tree every later selector and text_content call has to walk
+_HTML_PARSER = lxml.html.HTMLParser(remove_blank_text=True, remove_comments=True, encoding='utf-8')
+
+
+def _text(element):
+    """Collapse an lxml element's text content to single-spaced text."""
+    return ' '.join(element.text_content().split())
+
+
+# Keywords hinting that a description or spec row talks about applications
+_APP_KEYWORDS = ('ideal for', 'perfect for', 'used for', 'designed for', 'suitable for', 'applications')
+_SPEC_APP_KEYWORDS = ('application', 'use', 'usage', 'suitable')
+
+# Number of translation requests allowed in flight at once
+TRANSLATE_CONCURRENCY = int(os.getenv('TRANSLATE_CONCURRENCY', '8'))
+
+# How many product descriptions to translate per API call (1 = no batching)
+TRANSLATE_BATCH_SIZE = int(os.getenv('TRANSLATE_BATCH_SIZE', '10'))
+
+# System prompt shared by every translation request
+TRANSLATION_SYSTEM_MESSAGE = "You are a Spanish-speaking product content writer specializing in professional tools. Your job is to create accurate, effective product descriptions that properly represent each specific tool's features and applications."
+
+# Seller blurbs inserted after the product-name line of every description;
+# pliers must not carry the "FABRICADO EN ALEMANIA" claim
+FABRICATION_TEXT = "\n-- FABRICADO EN ALEMANIA (no es producto chino) --\n\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
+PROFITOOLS_TEXT = "\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
+
+# Product-name terms identifying pliers
+_PLIER_TERMS = ('plier', 'pliers', 'alicate', 'pinza')
+
+
+def _is_plier(product_data):
+    """Whether a product is a plier, based on its name."""
+    name = product_data.get('name', '').lower()
+    return any(term in name for term in _PLIER_TERMS)
+
 # Configure OpenAI API
 if OPENAI_API_KEY:
     openai.api_key = OPENAI_API_KEY
+    ASYNC_OPENAI_CLIENT = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
 else:
+    ASYNC_OPENAI_CLIENT = None
     print("Warning: OpenAI API key not found in .env file. Translation functionality will be disabled.")
 
 # Ensure the sitemap URL is provided
@@ -38,73 +240,275 @@ if not SITEMAP_URL:
 
 
 def fetch_sitemap(url):
-    """Fetch the sitemap XML from the given URL."""
+    """Fetch the sitemap XML from the given URL, returning raw bytes.
+
+    Gzipped sitemaps (.gz URLs) are decompressed transparently. Returning
+    bytes lets lxml consume the document directly without an extra UTF-8
+    decode pass over a multi-MB string.
+    """
     try:
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        return response.text
+        data = response.content
+        if url.endswith('.gz'):
+            data = gzip.decompress(data)
+        return data
     except requests.exceptions.RequestException as e:
         print(f"Error fetching sitemap: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+async def fetch_all_sitemaps(urls):
+    """Fetch several sitemap XML documents concurrently.
+
+    Returns a dict of URL -> raw bytes (gzip handled like fetch_sitemap).
+    Falls back to sequential fetching when aiohttp is unavailable; any
+    failed sitemap aborts the run, matching fetch_sitemap.
+    """
+    if aiohttp is None:
+        return {url: fetch_sitemap(url) for url in urls}
+
+    async def _fetch(session, url):
+        async with session.get(url) as response:
+            response.raise_for_status()
+            data = await response.read()
+        if url.endswith('.gz'):
+            data = gzip.decompress(data)
+        return data
+
+    connector = aiohttp.TCPConnector(limit=50, limit_per_host=10)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        results = await asyncio.gather(*[_fetch(session, url) for url in urls],
+                                       return_exceptions=True)
+
+    sitemaps = {}
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            print(f"Error fetching sitemap {url}: {result}", file=sys.stderr)
+            sys.exit(1)
+        sitemaps[url] = result
+    return sitemaps
+
+
+def _cache_path(url):
+    """Location of the cached HTML for a product URL."""
+    return CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html.gz"
+
+
+def _etag_path(url):
+    """Location of the ETag sidecar for a product URL."""
+    return _cache_path(url).with_suffix('.etag')
+
+
+def _cache_file(url):
+    """The existing cache file for a URL (gzipped or legacy plain), or None."""
+    path = _cache_path(url)
+    if path.exists():
+        return path
+    legacy = path.with_suffix('')  # pre-gzip cache entries
+    if legacy.exists():
+        return legacy
+    return None
+
+
+def _cache_get(url):
+    """Return cached HTML for a URL, or None when not cached."""
+    path = _cache_file(url)
+    if path is None:
+        return None
+    data = path.read_bytes()
+    if path.suffix == '.gz':
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+
+def _cache_fresh(url):
+    """Whether the cached copy is young enough to use without revalidating."""
+    if CACHE_MAX_AGE <= 0:
+        return True
+    path = _cache_file(url)
+    try:
+        return path is not None and time.time() - path.stat().st_mtime < CACHE_MAX_AGE
+    except OSError:
+        return False
+
+
+def _cache_etag(url):
+    """The stored ETag for a URL, or None."""
+    path = _etag_path(url)
+    return path.read_text(encoding='utf-8').strip() if path.exists() else None
+
+
+def _cache_refresh(url):
+    """Mark the cached copy fresh again after a 304 revalidation."""
+    path = _cache_file(url)
+    if path is not None:
+        path.touch()
+
+
+def _cache_put(url, html, etag=None):
+    """Store fetched HTML (gzipped) for a URL in the on-disk cache."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    _cache_path(url).write_bytes(gzip.compress(html.encode('utf-8')))
+    if etag:
+        _etag_path(url).write_text(etag, encoding='utf-8')
+
+
 def fetch_product_page(url):
     """Fetch the HTML content of a product page."""
+    cached = _cache_get(url)
+    if cached is not None and _cache_fresh(url):
+        print(f"  Using cached page for: {url}")
+        return cached
+
+    headers = {}
+    if cached is not None:
+        etag = _cache_etag(url)
+        if etag:
+            headers['If-None-Match'] = etag
+
+    try:
+        if HEAD_PRECHECK:
+            probe = SESSION.head(url, timeout=30, allow_redirects=True)
+            if probe.status_code >= 400:
+                print(f"  Product page not found (HEAD {probe.status_code}): {url}")
+                return None
+
+        print(f"  Fetching product page: {url}")
+        # Retries with backoff are handled by the Retry policy on SESSION
+        response = SESSION.get(url, timeout=30, headers=headers)
+
+        # Check if response is valid
+        if response.status_code == 304:
+            print(f"  Cached page still current (304): {url}")
+            _cache_refresh(url)
+            return cached
+
+        if response.status_code == 404:
+            print(f"  Product page not found (404): {url}")
+            return None
+
+        response.raise_for_status()
+
+        # Check if content is empty or too small (likely an error page)
+        if len(response.text) < 1000:  # Arbitrary small size check
+            print(f"  Warning: Response content too small ({len(response.text)} bytes), might not be a valid product page")
+
+        _cache_put(url, response.text, response.headers.get('ETag'))
+        return response.text
+
+    except requests.exceptions.RequestException as e:
+        print(f"  Error fetching product page {url}: {e}")
+        return None
+
+
+class _AsyncTokenBucket:
+    """Token-bucket rate limiter for asyncio workers.
+
+    Holds up to `rate` tokens, refilled continuously at `rate` per second;
+    acquire() takes one token and only sleeps once the budget is spent, so
+    requests burst up to the policy instead of pacing uniformly. A rate of
+    0 disables limiting.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_product_page_async(session, url, sem, limiter=None):
+    """Fetch the HTML content of a product page using a shared aiohttp session."""
+    cached = _cache_get(url)
+    if cached is not None and _cache_fresh(url):
+        print(f"  Using cached page for: {url}")
+        return cached
+
+    headers = {}
+    if cached is not None:
+        etag = _cache_etag(url)
+        if etag:
+            headers['If-None-Match'] = etag
+
     max_retries = 3
     retry_delay = 5  # seconds
-    
-    for attempt in range(1, max_retries + 1):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            print(f"  Fetching product page: {url} (attempt {attempt}/{max_retries})")
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            # Check if response is valid
-            if response.status_code == 404:
-                print(f"  Product page not found (404): {url}")
-                return None
-                
-            response.raise_for_status()
-            
-            # Check if content is empty or too small (likely an error page)
-            if len(response.text) < 1000:  # Arbitrary small size check
-                print(f"  Warning: Response content too small ({len(response.text)} bytes), might not be a valid product page")
-                
-            return response.text
-            
-        except requests.exceptions.Timeout:
-            print(f"  Timeout fetching product page (attempt {attempt}/{max_retries}): {url}")
-            if attempt < max_retries:
-                print(f"  Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                print(f"  Max retries reached. Giving up on: {url}")
-                return None
-                
-        except requests.exceptions.ConnectionError:
-            print(f"  Connection error fetching product page (attempt {attempt}/{max_retries}): {url}")
-            if attempt < max_retries:
-                print(f"  Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                print(f"  Max retries reached. Giving up on: {url}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"  Error fetching product page {url}: {e}")
+
+    async with sem:
+        if HEAD_PRECHECK:
+            try:
+                if limiter is not None:
+                    await limiter.acquire()
+                async with session.head(url, allow_redirects=True) as probe:
+                    if probe.status >= 400:
+                        print(f"  Product page not found (HEAD {probe.status}): {url}")
+                        return None
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                pass  # Probe failed; fall through to the normal GET with retries
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                if limiter is not None:
+                    await limiter.acquire()
+                print(f"  Fetching product page: {url} (attempt {attempt}/{max_retries})")
+                async with session.get(url, headers=headers) as response:
+                    # Check if response is valid
+                    if response.status == 304:
+                        print(f"  Cached page still current (304): {url}")
+                        _cache_refresh(url)
+                        return cached
+
+                    if response.status == 404:
+                        print(f"  Product page not found (404): {url}")
+                        return None
+
+                    response.raise_for_status()
+                    etag = response.headers.get('ETag')
+                    text = await response.text()
+
+                # Check if content is empty or too small (likely an error page)
+                if len(text) < 1000:  # Arbitrary small size check
+                    print(f"  Warning: Response content too small ({len(text)} bytes), might not be a valid product page")
+
+                _cache_put(url, text, etag)
+                return text
+
+            except asyncio.TimeoutError:
+                print(f"  Timeout fetching product page (attempt {attempt}/{max_retries}): {url}")
+            except aiohttp.ClientError as e:
+                print(f"  Error fetching product page {url} (attempt {attempt}/{max_retries}): {e}")
+
             if attempt < max_retries:
                 print(f"  Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+                await asyncio.sleep(retry_delay)
             else:
                 print(f"  Max retries reached. Giving up on: {url}")
-                return None
-    
-    return None  # Should never reach here, but just in case
+
+    return None
+
+
+def _empty_detail():
+    """A fresh detailed_info structure with its own nested containers."""
+    return {"description": "", "specifications": {}, "items_in_set": [], "applications": []}
 
 
-def parse_product_page(html_content):
+def parse_product_page(html_content, product_code=None):
     """
     Parse a product page HTML content to extract:
     - Product description
@@ -113,233 +517,211 @@ def parse_product_page(html_content):
     - Application cases (where mentioned)
     """
     if not html_content:
-        return {"description": "", "specifications": {}, "items_in_set": [], "applications": []}
-    
-    soup = BeautifulSoup(html_content, 'lxml')
-    result = {
-        "description": "",
-        "specifications": {},
-        "items_in_set": [],
-        "applications": []
-    }
-    
-    # Debug: Save HTML to file for inspection and print div classes only if debugging is enabled
+        return _empty_detail()
+
+    tree = lxml.html.fromstring(html_content.encode('utf-8'), parser=_HTML_PARSER)
+    result = _empty_detail()
+
+    # Debug: Save HTML to file for inspection and dump div classes only if debugging is enabled
     if DEBUG:
-        with open('debug_html.html', 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # Print all available div classes for debugging
-        print("Available div classes:")
-        for div in soup.find_all('div', class_=True):
-            print(f"  - {div.get('class')}")
-    
-    # Try multiple possible selectors for product description
-    description_selectors = [
-        '.product-single__description', 
-        '.product__description',
-        '.product-description',
-        '.description',
-        '[itemprop="description"]',
-        '.product-detail'
-    ]
-    
-    for selector in description_selectors:
-        description_div = soup.select_one(selector)
-        if description_div:
-            result["description"] = description_div.get_text(strip=True)
-            print(f"Found description with selector: {selector}")
-            
-            # Try to find application cases in the description
-            desc_text = description_div.get_text().lower()
-            if any(kw in desc_text for kw in ['ideal for', 'perfect for', 'used for', 'designed for', 'suitable for', 'applications']):
-                # There might be application information in the description
-                result["applications"].append(description_div.get_text())
-            break
-    
-    # Try multiple possible selectors for specifications
-    spec_selectors = [
-        '.product-single__specs-table',
-        '.specs-table',
-        '.product-specs',
-        '.specifications',
-        'table.specs',
-        '[itemprop="additionalProperty"]'
-    ]
-    
-    for selector in spec_selectors:
-        spec_tables = soup.select(selector)
-        if spec_tables:
-            print(f"Found specifications with selector: {selector}")
-            for table in spec_tables:
-                # Try to find table rows
-                rows = table.select('tr')
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) >= 2:
-                        key = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        result["specifications"][key] = value
-                        
-                        # Check if any specification mentions applications
-                        if any(app in key.lower() for app in ['application', 'use', 'usage', 'suitable']):
-                            result["applications"].append(f"{key}: {value}")
-            break
-    
-    # Alternative: Look for product metadata in JSON-LD
-    json_ld = soup.find('script', type='application/ld+json')
-    if json_ld:
-        try:
-            json_data = json.loads(json_ld.string)
-            print("Found JSON-LD data")
-            
-            # Extract product info from JSON-LD
-            if isinstance(json_data, dict):
-                # Extract description if available
-                if 'description' in json_data and not result["description"]:
-                    result["description"] = json_data['description']
-                
-                # Extract other properties if available
-                if 'additionalProperty' in json_data:
-                    for prop in json_data['additionalProperty']:
-                        if 'name' in prop and 'value' in prop:
-                            result["specifications"][prop['name']] = prop['value']
-        except (json.JSONDecodeError, AttributeError) as e:
-            print(f"  Error parsing JSON-LD: {e}")
-    
+        # One file per product so pages don't overwrite each other
+        debug_name = f"debug_{product_code}.html" if product_code else "debug_html.html"
+        Path(debug_name).write_text(html_content, encoding='utf-8')
+
+        # Dump all available div classes in one write instead of a print per div
+        sys.stderr.write("Available div classes:\n")
+        sys.stderr.write('\n'.join(div.get('class') for div in tree.xpath('//div[@class]')))
+        sys.stderr.write('\n')
+
+    # Find the product description (combined selector, first match wins)
+    matches = DESC_SEL(tree)
+    if matches:
+        # Extract the text once; the lowercase keyword check reuses it
+        text = _text(matches[0])
+        result["description"] = text
+        print("Found description via combined selector")
+
+        # Try to find application cases in the description
+        lowered = text.lower()
+        if any(kw in lowered for kw in _APP_KEYWORDS):
+            # There might be application information in the description
+            result["applications"].append(text)
+
+    # Find specification tables (combined selector)
+    spec_tables = SPEC_SEL(tree)
+    if spec_tables:
+        print("Found specifications via combined selector")
+        for table in spec_tables:
+            # Try to find table rows
+            for row in _TR_SEL(table):
+                cells = _TD_SEL(row)
+                if len(cells) >= 2:
+                    key = _text(cells[0])
+                    value = _text(cells[1])
+                    result["specifications"][key] = value
+
+                    # Check if any specification mentions applications
+                    if any(app in key.lower() for app in _SPEC_APP_KEYWORDS):
+                        result["applications"].append(f"{key}: {value}")
+
+    # Alternative: Look for product metadata in JSON-LD, but only when the
+    # selectors above left gaps - on well-structured pages this whole scan
+    # (and the definition-list fallback below) is skipped
+    if not result["description"] or not result["specifications"]:
+        json_ld_texts = _JSONLD_TEXT_XPATH(tree)
+        if json_ld_texts:
+            try:
+                json_data = _json_loads(json_ld_texts[0])
+                print("Found JSON-LD data")
+
+                # Extract product info from JSON-LD
+                if isinstance(json_data, dict):
+                    # Extract description if available
+                    if 'description' in json_data and not result["description"]:
+                        result["description"] = json_data['description']
+
+                    # Extract other properties if available
+                    if 'additionalProperty' in json_data:
+                        for prop in json_data['additionalProperty']:
+                            if 'name' in prop and 'value' in prop:
+                                result["specifications"][prop['name']] = prop['value']
+            except (ValueError, TypeError) as e:  # covers both json and orjson decode errors
+                print(f"  Error parsing JSON-LD: {e}")
+
     # If no specifications were found, look for any definition lists which often contain specs
     if not result["specifications"]:
-        dl_elements = soup.find_all('dl')
-        for dl in dl_elements:
-            dts = dl.find_all('dt')
-            dds = dl.find_all('dd')
+        for dl in tree.xpath('//dl'):
+            dts = dl.xpath('.//dt')
+            dds = dl.xpath('.//dd')
             for i in range(min(len(dts), len(dds))):
-                key = dts[i].get_text(strip=True)
-                value = dds[i].get_text(strip=True)
+                key = _text(dts[i])
+                value = _text(dds[i])
                 result["specifications"][key] = value
-    
-    # Check for items in set
-    set_items_selectors = [
-        '.product-single__set-items',
-        '.set-items',
-        '.product-set',
-        '.package-contents',
-        '.included-items'
-    ]
-    
-    for selector in set_items_selectors:
-        set_items_div = soup.select(selector)
-        if set_items_div:
-            print(f"Found set items with selector: {selector}")
-            item_elements = set_items_div[0].select('.set-item, .item')
-            for item in item_elements:
-                item_name = item.select_one('.set-item__name, .item-name, .name')
-                if item_name:
-                    result["items_in_set"].append(item_name.get_text(strip=True))
-            break
-    
+
+    # Check for items in set (combined selector)
+    set_items_divs = SET_ITEMS_SEL(tree)
+    if set_items_divs:
+        print("Found set items via combined selector")
+        for item in _SET_ITEM_SEL(set_items_divs[0]):
+            item_names = _SET_ITEM_NAME_SEL(item)
+            if item_names:
+                result["items_in_set"].append(_text(item_names[0]))
+
     # If still no description or specs, try a more general approach
     if not result["description"] and not result["specifications"]:
         # Look for any content in product information sections
-        product_sections = soup.select('.product-info, .product-details, .product-information, .product-data')
-        for section in product_sections:
-            text = section.get_text(strip=True)
+        for section in _PRODUCT_INFO_SEL(tree):
+            text = _text(section)
             if text and not result["description"]:
                 result["description"] = text
-    
-    print(f"Parsing results: description: {bool(result['description'])}, " + 
-          f"specs: {len(result['specifications'])}, " + 
-          f"set items: {len(result['items_in_set'])}, " + 
+
+    print(f"Parsing results: description: {bool(result['description'])}, " +
+          f"specs: {len(result['specifications'])}, " +
+          f"set items: {len(result['items_in_set'])}, " +
           f"applications: {len(result['applications'])}")
-    
+
     return result
 
 
+# Specification keys that are identifiers rather than product features
+_SKIP_SPEC_KEYS = frozenset(('product code', 'sku', 'upc'))
+
+
 def create_product_description(product_data, detailed_info):
     """
     Create a comprehensive product description in English based on:
     - Basic product data (name, code)
     - Detailed info extracted from the product page
+
+    Sections are appended to a single accumulator with explicit blank lines,
+    so the whole description is built with one final join.
     """
     # Product name and code for the title
-    product_title = f"Wiha {product_data['code']} - {product_data['name']}"
-    
+    parts = [f"Wiha {product_data['code']} - {product_data['name']}", ""]
+
     # Introduction paragraph - highlight benefits and use cases
     intro = f"The Wiha {product_data['code']} {product_data['name']} is a premium quality tool designed for professional use and demanding applications. "
-    
+
     if detailed_info["description"]:
         # Add the official description, but clean it up a bit
         intro += detailed_info["description"]
     else:
         # Generic description if none is available
         intro += "Crafted with Wiha's renowned German engineering, this tool offers exceptional durability, precision, and ergonomic design to ensure comfort during extended use."
-    
-    # Main features section
-    features = ["Features:"]
-    
-    # Extract key features from specifications
-    if detailed_info["specifications"]:
-        for key, value in detailed_info["specifications"].items():
-            if key.lower() not in ["product code", "sku", "upc"]:  # Skip non-feature specs
-                features.append(f"- {key}: {value}")
-    
+
+    parts.append(intro)
+    parts.append("")
+
+    # Main features section, extracted from specifications
+    parts.append("Features:")
+    n_features = 0
+    for key, value in detailed_info["specifications"].items():
+        if key.lower() not in _SKIP_SPEC_KEYS:  # Skip non-feature specs
+            parts.append(f"- {key}: {value}")
+            n_features += 1
+
     # Generic features if none are found
-    if len(features) <= 1:
-        features.extend([
+    if n_features == 0:
+        parts.extend([
             "- Premium German engineering and construction",
             "- Ergonomic design for comfortable use",
             "- Made from high-quality materials for durability",
-            f"- Part of Wiha's professional-grade tool lineup"
+            "- Part of Wiha's professional-grade tool lineup"
         ])
-    
+
     # Applications section (if any found)
-    applications = []
     if detailed_info["applications"]:
-        applications.append("\nApplications:")
+        parts.append("")
+        parts.append("Applications:")
         for app in detailed_info["applications"]:
-            applications.append(f"- {app}")
-    
+            parts.append(f"- {app}")
+
     # Set items section (if applicable)
-    set_items = []
     if detailed_info["items_in_set"]:
-        set_items.append("\nThis set includes:")
+        parts.append("")
+        parts.append("This set includes:")
         for item in detailed_info["items_in_set"]:
-            set_items.append(f"- {item}")
-    
+            parts.append(f"- {item}")
+
     # Additional information section
-    additional_info = [
-        "\nAdditional Information:",
-        f"- Brand: Wiha",
+    parts.extend([
+        "",
+        "Additional Information:",
+        "- Brand: Wiha",
         f"- Model: {product_data['code']}",
         "- Made in Germany",
-        "- Professional-grade quality"
-    ]
-    
+        "- Professional-grade quality",
+        ""
+    ])
+
     # Closing statement - call to action and brand reinforcement
-    closing = "\nWith Wiha's commitment to excellence and innovation, the " + \
-              f"{product_data['name']} delivers the reliability and performance that professionals demand. " + \
-              "Elevate your work with tools engineered to meet the highest standards."
-    
-    # Combine all sections
-    sections = [
-        product_title,
-        "",
-        intro,
-        "",
-        "\n".join(features),
-        "\n".join(applications) if applications else "",
-        "\n".join(set_items) if set_items else "",
-        "\n".join(additional_info),
-        "",
-        closing
-    ]
-    
-    return "\n".join(sections).replace("\n\n\n", "\n\n")
+    parts.append("With Wiha's commitment to excellence and innovation, the " +
+                 f"{product_data['name']} delivers the reliability and performance that professionals demand. " +
+                 "Elevate your work with tools engineered to meet the highest standards.")
+
+    return "\n".join(parts)
+
+
+def _postprocess_translation(translated_text, is_plier):
+    """Strip markdown from a model response and insert the seller blurb.
+
+    The blurb goes right after the first line (the product name); if the
+    response is a single line it is simply appended.
+    """
+    plain_text = _MD_SUB.sub(_md_repl, translated_text)
+    insert_text = PROFITOOLS_TEXT if is_plier else FABRICATION_TEXT
+
+    # partition splits in one scan; sep is empty when there is no newline
+    head, sep, tail = plain_text.partition('\n')
+    if sep:
+        return f'{head}{sep}{insert_text}{tail}'
+    return plain_text + insert_text
 
 
-def translate_to_spanish(text, product_data, detailed_info):
+async def translate_to_spanish(text, product_data, detailed_info):
     """
     Generate an effective Spanish product description using OpenAI API.
-    
+
     Args:
         text: English description to translate
         product_data: Dictionary containing product information (code, name, etc.)
@@ -363,11 +745,10 @@ def translate_to_spanish(text, product_data, detailed_info):
         print(f"  Specifications count: {len(product_info['specifications'])}")
         
         # Check if product is a plier
-        product_name_lower = product_data.get('name', '').lower()
-        is_plier = any(term in product_name_lower for term in ['plier', 'pliers', 'alicate', 'pinza'])
+        is_plier = _is_plier(product_data)
         
         # Convert to JSON for the prompt
-        product_json = json.dumps(product_info, indent=2)
+        product_json = _json_dumps_indented(product_info)
         
         # Add information about product type to the prompt
         additional_instructions = ""
@@ -406,16 +787,13 @@ def translate_to_spanish(text, product_data, detailed_info):
         """
         
         print(f"  Sending request to OpenAI API, model gpt-4o")
-        
-        # Create OpenAI client
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
+
         try:
             # Updated API call with model
-            response = client.chat.completions.create(
+            response = await ASYNC_OPENAI_CLIENT.chat.completions.create(
                 model="gpt-4o",
                 messages=[
-                    {"role": "system", "content": "You are a Spanish-speaking product content writer specializing in professional tools. Your job is to create accurate, effective product descriptions that properly represent each specific tool's features and applications."},
+                    {"role": "system", "content": TRANSLATION_SYSTEM_MESSAGE},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
@@ -426,85 +804,29 @@ def translate_to_spanish(text, product_data, detailed_info):
             translated_text = response.choices[0].message.content.strip()
             
             print(f"  Successfully received translation, length: {len(translated_text)}")
-            
-            # Process text to ensure it's plain text
-            plain_text = re.sub(r'#{1,6}\s+', '', translated_text)
-            plain_text = re.sub(r'\*\*(.+?)\*\*', r'\1', plain_text)
-            plain_text = re.sub(r'\*(.+?)\*', r'\1', plain_text)
-            plain_text = re.sub(r'__(.+?)__', r'\1', plain_text)
-            plain_text = re.sub(r'_(.+?)_', r'\1', plain_text)
-            plain_text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', plain_text)
-            
-            # Conditionally add the "FABRICADO EN ALEMANIA" text if not a plier
-            if not is_plier:
-                fabrication_text = "\n-- FABRICADO EN ALEMANIA (no es producto chino) --\n\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
-                
-                # Find the end of the first line (product name)
-                first_line_end = plain_text.find('\n')
-                if first_line_end != -1:
-                    # Insert the fabrication text after the first line
-                    plain_text = plain_text[:first_line_end+1] + fabrication_text + plain_text[first_line_end+1:]
-                else:
-                    # If no newline found, add it after the whole text
-                    plain_text = plain_text + fabrication_text
-            else:
-                # For pliers, just add the PROFITOOLS line
-                profitools_text = "\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
-                
-                # Find the end of the first line (product name)
-                first_line_end = plain_text.find('\n')
-                if first_line_end != -1:
-                    # Insert the text after the first line
-                    plain_text = plain_text[:first_line_end+1] + profitools_text + plain_text[first_line_end+1:]
-                else:
-                    # If no newline found, add it after the whole text
-                    plain_text = plain_text + profitools_text
-            
-            return plain_text
-        
+
+            return _postprocess_translation(translated_text, is_plier)
+
         except openai.OpenAIError as oe:
             print(f"  OpenAI API Error: {oe}")
             # Try to handle rate limits by waiting and retrying once
             if "rate limit" in str(oe).lower():
                 print("  Rate limit hit. Waiting 20 seconds and retrying once...")
-                time.sleep(20)
+                await asyncio.sleep(20)
                 try:
-                    response = client.chat.completions.create(
+                    response = await ASYNC_OPENAI_CLIENT.chat.completions.create(
                         model="gpt-4o",
                         messages=[
-                            {"role": "system", "content": "You are a Spanish-speaking product content writer specializing in professional tools. Your job is to create accurate, effective product descriptions that properly represent each specific tool's features and applications."},
+                            {"role": "system", "content": TRANSLATION_SYSTEM_MESSAGE},
                             {"role": "user", "content": prompt}
                         ],
                         temperature=0.5,
                         max_tokens=1500
                     )
                     translated_text = response.choices[0].message.content.strip()
-                    
+
                     # Rest of processing same as above
-                    plain_text = re.sub(r'#{1,6}\s+', '', translated_text)
-                    plain_text = re.sub(r'\*\*(.+?)\*\*', r'\1', plain_text)
-                    plain_text = re.sub(r'\*(.+?)\*', r'\1', plain_text)
-                    plain_text = re.sub(r'__(.+?)__', r'\1', plain_text)
-                    plain_text = re.sub(r'_(.+?)_', r'\1', plain_text)
-                    plain_text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', plain_text)
-                    
-                    # Add appropriate text
-                    if not is_plier:
-                        fabrication_text = "\n-- FABRICADO EN ALEMANIA (no es producto chino) --\n\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
-                        first_line_end = plain_text.find('\n')
-                        if first_line_end != -1:
-                            plain_text = plain_text[:first_line_end+1] + fabrication_text + plain_text[first_line_end+1:]
-                        else:
-                            plain_text = plain_text + fabrication_text
-                    else:
-                        profitools_text = "\nSomos PROFITOOLS, el único representante oficial de Wiha en Argentina.\n\n"
-                        first_line_end = plain_text.find('\n')
-                        if first_line_end != -1:
-                            plain_text = plain_text[:first_line_end+1] + profitools_text + plain_text[first_line_end+1:]
-                        else:
-                            plain_text = plain_text + profitools_text
-                    
-                    return plain_text
+                    return _postprocess_translation(translated_text, is_plier)
                 except Exception as e2:
                     return f"NOT FOUND - OpenAI API Error after retry: {str(e2)}"
             return f"NOT FOUND - OpenAI API Error: {str(oe)}"
@@ -514,44 +836,322 @@ def translate_to_spanish(text, product_data, detailed_info):
         return f"NOT FOUND - Error in translation process: {str(e)}"
 
 
-def parse_product_sitemap(xml_content):
-    """Parse product sitemap XML and extract product information."""
-    root = ElementTree.fromstring(xml_content)
-    
-    # Define namespace mapping
-    namespaces = {
-        'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9',
-        'image': 'http://www.google.com/schemas/sitemap-image/1.1'
-    }
-    
+async def translate_batch(products):
+    """Translate several product descriptions in a single API call.
+
+    The products go in as a JSON array and the model is asked for a JSON
+    array of {"code": ..., "text": ...} back, amortizing the per-request
+    overhead across the batch. Any product missing from the response (or the
+    whole batch, if it cannot be parsed) falls back to a per-product call.
+    Returns Spanish descriptions in the same order as `products`.
+    """
+    if not OPENAI_API_KEY:
+        return ["API key not provided. Translation skipped."] * len(products)
+
+    async def _single(product):
+        return await translate_to_spanish(
+            product['english_description'], product, product['detailed_info'])
+
+    if len(products) == 1:
+        return [await _single(products[0])]
+
+    items = []
+    for product in products:
+        detailed_info = product['detailed_info']
+        items.append({
+            "code": product.get('code', ''),
+            "name": product.get('name', ''),
+            "raw_description": detailed_info.get("description", ""),
+            "specifications": detailed_info.get("specifications", {}),
+            "items_in_set": detailed_info.get("items_in_set", []),
+            "english_description": product['english_description']
+        })
+
+    prompt = f"""
+        Create an effective Spanish product description for Mercado Libre for EACH of the following Wiha tools.
+        Focus on ACCURACY first - make sure you correctly describe each specific product's features and uses.
+
+        PRODUCTS (JSON array):
+        {_json_dumps_indented(items)}
+
+        Guidelines for every description:
+        1. START WITH THE PRODUCT NAME IN SPANISH (translated from "<code> <name>") as the first line.
+        2. Accurately describe that specific product - its exact features, specifications, and intended uses
+        3. Highlight the practical benefits of that specific tool
+        4. Include relevant application cases where the tool would be used
+        5. If it's a set, clearly list the items included
+        6. Maintain a professional marketing tone without exaggeration
+        7. Keep technical measurements and specifications accurate
+        8. Descriptions must be PLAIN TEXT (no markdown or HTML), with clear section titles like "Características:" and simple dash lists
+        9. IMPORTANT: Convert any weight measurements from pounds (lb) to kilograms (kg)
+        10. For products that are pliers, do not mention 'FABRICADO EN ALEMANIA'
+
+        Respond with ONLY a JSON array, one entry per input product, shaped like:
+        [{{"code": "<product code>", "text": "<Spanish description>"}}, ...]
+        """
+
+    print(f"  Sending batch of {len(products)} descriptions to OpenAI API, model gpt-4o")
+
+    by_code = {}
+    try:
+        response = await ASYNC_OPENAI_CLIENT.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": TRANSLATION_SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=1500 * len(products)
+        )
+        content = response.choices[0].message.content.strip()
+
+        # Tolerate a fenced code block around the JSON
+        if content.startswith('```'):
+            content = content.strip('`')
+            if content.startswith('json'):
+                content = content[4:]
+
+        parsed = _json_loads(content)
+        by_code = {str(item['code']): item.get('text', '')
+                   for item in parsed if isinstance(item, dict) and 'code' in item}
+    except Exception as e:
+        print(f"  Batch translation failed ({e}); falling back to per-product calls")
+
+    results = []
+    for product in products:
+        text = by_code.get(str(product.get('code', '')))
+        if text:
+            results.append(_postprocess_translation(text.strip(), _is_plier(product)))
+        else:
+            results.append(await _single(product))
+    return results
+
+
+async def process_products(products, csv_writer, out_file):
+    """Process products through overlapping fetch -> parse -> translate stages.
+
+    Each stage runs as a pool of workers connected by bounded asyncio queues,
+    so network waits, CPU-bound parsing and OpenAI latency overlap instead of
+    adding up per product. Finished rows stream straight to the CSV writer.
+    Returns a stats dict for the final summary.
+    """
+    loop = asyncio.get_running_loop()
+    stats = {'processed': 0, 'successful': 0, 'failed': 0, 'errors': []}
+
+    fetch_q = asyncio.Queue()
+    parse_q = asyncio.Queue(maxsize=FETCH_CONCURRENCY * 2)
+    translate_q = asyncio.Queue(maxsize=TRANSLATE_CONCURRENCY * 2)
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    limiter = _AsyncTokenBucket(REQUESTS_PER_SECOND)
+
+    rows_written = 0
+
+    def _write_row(product):
+        nonlocal rows_written
+        csv_writer.writerow(product)
+        rows_written += 1
+        # Flush periodically rather than per row; the final close() in main
+        # flushes whatever remains
+        if rows_written % 50 == 0:
+            out_file.flush()
+
+    def _error_row(product, english, spanish, error_tag):
+        enhanced_product = product.copy()
+        enhanced_product['english_description'] = english
+        enhanced_product['spanish_description'] = spanish
+        enhanced_product['detailed_info'] = _empty_detail()
+        _write_row(enhanced_product)
+        stats['processed'] += 1
+        stats['failed'] += 1
+        stats['errors'].append(error_tag)
+
+    async def fetcher(session):
+        while True:
+            product = await fetch_q.get()
+            if product is None:
+                return
+            url = product['product_url']
+            try:
+                if session is not None:
+                    html_content = await fetch_product_page_async(session, url, sem, limiter)
+                else:
+                    # No aiohttp: run the synchronous fetcher in a thread
+                    async with sem:
+                        await limiter.acquire()
+                        html_content = await loop.run_in_executor(None, fetch_product_page, url)
+            except Exception as e:
+                print(f"  Error fetching product page {url}: {e}")
+                html_content = None
+            await parse_q.put((product, html_content))
+
+    async def parser():
+        while True:
+            item = await parse_q.get()
+            if item is None:
+                return
+            product, html_content = item
+            print(f"\n----- Processing product: {product['code']} - {product['name']} -----")
+
+            if not html_content:
+                print(f"  Skipping product {product['code']} due to fetch error")
+                # Instead of skipping, add it with error message
+                _error_row(product,
+                           "NOT FOUND - Could not fetch product page",
+                           "NOT FOUND - No se pudo obtener la página del producto",
+                           f"{product['code']} - {product['name']} (fetch error)")
+                continue
+
+            try:
+                # Parse product page to extract detailed information
+                detailed_info = await loop.run_in_executor(
+                    parse_executor, parse_product_page, html_content, product['code'])
+
+                # Create English description
+                english_description = create_product_description(product, detailed_info)
+            except Exception as e:
+                print(f"  Error processing product {product['code']}: {e}")
+                _error_row(product, f"ERROR - {str(e)}", f"NOT FOUND - Error: {str(e)}",
+                           f"{product['code']} - {product['name']} (processing error: {str(e)[:50]}...)")
+                continue
+
+            enhanced_product = product.copy()
+            enhanced_product['english_description'] = english_description
+            enhanced_product['detailed_info'] = detailed_info
+            await translate_q.put(enhanced_product)
+
+    async def translator():
+        while True:
+            enhanced_product = await translate_q.get()
+            if enhanced_product is None:
+                return
+
+            # Gather up to TRANSLATE_BATCH_SIZE products so they share one API
+            # call; stop early if the queue goes quiet rather than stall
+            batch = [enhanced_product]
+            while len(batch) < TRANSLATE_BATCH_SIZE:
+                try:
+                    item = await asyncio.wait_for(translate_q.get(), timeout=2.0)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    # Hand the sentinel to a peer translator and stop filling
+                    translate_q.put_nowait(None)
+                    break
+                batch.append(item)
+
+            print(f"  Translating descriptions for {len(batch)} product(s): "
+                  + ', '.join(p['code'] for p in batch))
+            try:
+                spanish_descriptions = await translate_batch(batch)
+            except Exception as e:
+                spanish_descriptions = [
+                    f"NOT FOUND - Error in translation process: {str(e)}"] * len(batch)
+
+            for enhanced_product, spanish_description in zip(batch, spanish_descriptions):
+                enhanced_product['spanish_description'] = spanish_description
+                _write_row(enhanced_product)
+                stats['processed'] += 1
+
+                # Check if there was an error in translation
+                if spanish_description.startswith("NOT FOUND"):
+                    stats['failed'] += 1
+                    stats['errors'].append(f"{enhanced_product['code']} - {enhanced_product['name']} (translation error)")
+                else:
+                    stats['successful'] += 1
+
+    if PARSE_PROCESSES > 0:
+        # True parallelism across cores, at the cost of pickling each page
+        parse_executor = ProcessPoolExecutor(max_workers=PARSE_PROCESSES)
+        n_parsers = PARSE_PROCESSES
+    else:
+        parse_executor = None  # default thread pool; lxml releases the GIL while parsing
+        n_parsers = 2
+
+    for product in products:
+        fetch_q.put_nowait(product)
+    for _ in range(FETCH_CONCURRENCY):
+        fetch_q.put_nowait(None)
+
+    session = None
+    if aiohttp is not None:
+        connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60)
+        session = aiohttp.ClientSession(connector=connector,
+                                        timeout=aiohttp.ClientTimeout(total=30),
+                                        headers={'User-Agent': USER_AGENT})
+    else:
+        print("aiohttp not installed; fetching pages with threads instead")
+
+    try:
+        fetchers = [asyncio.create_task(fetcher(session)) for _ in range(FETCH_CONCURRENCY)]
+        parsers = [asyncio.create_task(parser()) for _ in range(n_parsers)]
+        translators = [asyncio.create_task(translator()) for _ in range(TRANSLATE_CONCURRENCY)]
+
+        # Each stage drains before its successor receives shutdown sentinels
+        await asyncio.gather(*fetchers)
+        for _ in range(n_parsers):
+            await parse_q.put(None)
+        await asyncio.gather(*parsers)
+        for _ in range(TRANSLATE_CONCURRENCY):
+            await translate_q.put(None)
+        await asyncio.gather(*translators)
+    finally:
+        if session is not None:
+            await session.close()
+        if parse_executor is not None:
+            parse_executor.shutdown()
+
+    return stats
+
+
+def _iter_sitemap_elements(xml_content, tag):
+    """Stream elements with the given tag from sitemap XML using lxml.iterparse.
+
+    Each element is cleared (and its already-processed siblings dropped) after
+    it is yielded, so peak memory stays at one element instead of the full tree.
+    """
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+
+    for _event, elem in etree.iterparse(BytesIO(xml_content), events=('end',), tag=tag):
+        yield elem
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def parse_product_sitemap(xml_content, wanted=None):
+    """Parse product sitemap XML and extract product information.
+
+    When `wanted` is a set of product codes, entries whose extracted code is
+    not in it are dropped during the streaming parse instead of being
+    materialized and filtered later. Extraction still runs per entry because
+    codes often come from the image caption rather than the URL.
+    """
     product_data = []
-    
+
     # Process each URL in the sitemap
-    for url_elem in root.findall('.//ns:url', namespaces):
-        loc = url_elem.find('ns:loc', namespaces)
+    for url_elem in _iter_sitemap_elements(xml_content, SITEMAP_URL_TAG):
+        loc = url_elem.find(SITEMAP_LOC_TAG)
         if loc is not None and '/products/' in loc.text:
             # This is a product URL
             product_url = loc.text
-            
+
             # Get the image URL if available
-            image_loc = url_elem.find('.//image:loc', namespaces)
+            image_loc = url_elem.find(IMAGE_LOC_PATH)
             image_url = image_loc.text if image_loc is not None else ""
-            
+
             # Get image caption if available (often contains product code and name)
             image_caption = None
-            caption_elem = url_elem.find('.//image:caption', namespaces)
+            caption_elem = url_elem.find(IMAGE_CAPTION_PATH)
             if caption_elem is not None and caption_elem.text:
                 image_caption = caption_elem.text
-            
-            # Extract product code and name - first try from the full text content
-            text_content = ''.join(url_elem.itertext())
-            
+
             # Initialize variables
             product_code = None
             product_name = None
-            
+
             # Try multiple extraction methods to increase chances of finding code
-            
+
             # Method 1: Look for pattern "Wiha CODE PRODUCT_NAME" in caption
             if image_caption and 'Wiha ' in image_caption:
                 parts = image_caption.split('Wiha ')
@@ -561,41 +1161,46 @@ def parse_product_sitemap(xml_content):
                         product_code = code_and_rest[0].strip()
                     if len(code_and_rest) > 1:
                         product_name = code_and_rest[1].strip()
-            
+
             # Method 2: If no code found yet, try from entire text content
-            if not product_code and 'Wiha ' in text_content:
-                parts = text_content.split('Wiha ')
-                if len(parts) > 1:
-                    code_and_rest = parts[1].strip().split(' ', 1)
-                    if len(code_and_rest) > 0:
-                        product_code = code_and_rest[0].strip()
-                    if len(code_and_rest) > 1:
-                        product_name = code_and_rest[1].strip()
+            # (only stitched together when actually needed)
+            if not product_code:
+                text_content = ''.join(url_elem.itertext())
+                if 'Wiha ' in text_content:
+                    parts = text_content.split('Wiha ')
+                    if len(parts) > 1:
+                        code_and_rest = parts[1].strip().split(' ', 1)
+                        if len(code_and_rest) > 0:
+                            product_code = code_and_rest[0].strip()
+                        if len(code_and_rest) > 1:
+                            product_name = code_and_rest[1].strip()
             
             # Method 3: Try to extract code from the URL itself
             if not product_code:
-                # Extract from URL pattern like /products/tool-name-12345
-                url_parts = product_url.rstrip('/').split('/')
-                if url_parts:
-                    last_part = url_parts[-1]
+                # Grab the slug from /products/tool-name-12345 in one pass
+                slug_match = _PRODUCT_SLUG.search(product_url)
+                if slug_match:
+                    slug = slug_match.group(1)
                     # Look for numbers at the end of the URL
-                    matches = re.findall(r'\d+$', last_part)
-                    if matches:
-                        product_code = matches[0]
+                    tail_match = _CODE_TAIL.search(slug)
+                    if tail_match:
+                        product_code = tail_match.group(0)
                     else:
                         # Look for common patterns like product-name-12345
-                        matches = re.findall(r'-(\d+)(?:-|$)', last_part)
-                        if matches:
-                            product_code = matches[0]
+                        dash_match = _CODE_DASH.search(slug)
+                        if dash_match:
+                            product_code = dash_match.group(1)
             
             # Method 4: Try to extract from product name pattern
             if not product_code and product_name:
                 # Some product names end with the code in parentheses or after a dash
-                matches = re.findall(r'[-(](\d+)[)-]', product_name)
+                matches = _CODE_PAREN.findall(product_name)
                 if matches:
                     product_code = matches[0]
             
             # If we found a product code, add it to our data
+            if product_code and wanted is not None and product_code not in wanted:
+                continue
             if product_code:
                 product_data.append({
                     'code': product_code,
@@ -614,35 +1219,16 @@ def parse_product_sitemap(xml_content):
 def get_product_sitemaps(sitemap_url):
     """Get all product sitemap URLs from the main sitemap index."""
     xml_content = fetch_sitemap(sitemap_url)
-    root = ElementTree.fromstring(xml_content)
-    
-    # Define namespace
-    namespaces = {
-        'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'
-    }
-    
+
     product_sitemaps = []
-    
+
     # Look for sitemap URLs that contain "sitemap_products" in their name
-    for sitemap_elem in root.findall('.//ns:sitemap', namespaces):
-        loc = sitemap_elem.find('ns:loc', namespaces)
+    for sitemap_elem in _iter_sitemap_elements(xml_content, SITEMAP_SITEMAP_TAG):
+        loc = sitemap_elem.find(SITEMAP_LOC_TAG)
         if loc is not None and 'sitemap_products' in loc.text:
             product_sitemaps.append(loc.text)
-    
-    return product_sitemaps
-
 
-def filter_products_by_code(product_data, product_codes):
-    """Filter product data to only include products with specified codes."""
-    if not product_codes:
-        return product_data
-    
-    filtered_data = []
-    for product in product_data:
-        if product['code'] in product_codes:
-            filtered_data.append(product)
-    
-    return filtered_data
+    return product_sitemaps
 
 
 def read_product_codes_csv(filename):
@@ -668,27 +1254,52 @@ def create_empty_input_csv():
         csvfile.write("ProductCode\n# Add your product codes below, one per line\n")
 
 
-def write_product_data_csv(product_data, filename):
-    """Write product data to CSV file."""
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            'Product Code', 
-            'Product Name', 
-            'Image URL', 
-            'Product URL', 
-            'Spanish Description'  # Removed English Description column
-        ])
-        for product in product_data:
-            writer.writerow([
-                product.get('code', ''),
-                product.get('name', ''),
-                product.get('image_url', ''),
-                product.get('product_url', ''),
-                product.get('spanish_description', '')  # Only include Spanish description
-            ])
-    
-    print(f"Product data written to {filename}")
+# Product-dict keys written to the output CSV and their header labels
+OUTPUT_FIELDS = ('code', 'name', 'image_url', 'product_url', 'spanish_description')
+OUTPUT_HEADER = {
+    'code': 'Product Code',
+    'name': 'Product Name',
+    'image_url': 'Image URL',
+    'product_url': 'Product URL',
+    'spanish_description': 'Spanish Description'  # Removed English Description column
+}
+
+
+def open_product_csv(filename, append=False):
+    """Open the output CSV, write the header row, and return (file, writer).
+
+    Rows are streamed to this writer as products finish processing, so a
+    crash partway through a run keeps everything translated so far. With
+    append=True, existing rows are kept and no new header is written.
+    """
+    csvfile = open(filename, 'a' if append else 'w', newline='', encoding='utf-8',
+                   buffering=1 << 20)
+    writer = csv.DictWriter(csvfile, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+    if not append:
+        writer.writerow(OUTPUT_HEADER)
+    return csvfile, writer
+
+
+def load_done_codes(filename):
+    """Return the product codes already written to the output CSV, if any."""
+    if not os.path.exists(filename):
+        return set()
+
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        return {row['Product Code'] for row in csv.DictReader(csvfile)
+                if row.get('Product Code')}
+
+
+def _iter_sitemap_chunks(url, chunk_size=64 * 1024):
+    """Stream a sitemap as bytes chunks, inflating gzip on the fly."""
+    response = SESSION.get(url, stream=True, timeout=30)
+    response.raise_for_status()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if url.endswith('.gz') else None
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
 
 
 def check_sitemap_products(sitemap_url, product_codes):
@@ -711,15 +1322,36 @@ def check_sitemap_products(sitemap_url, product_codes):
         
         print(f"  Checking for product codes directly in XML of: {first_sitemap_url}")
         
-        # Fetch the XML content
-        xml_content = fetch_sitemap(first_sitemap_url)
-        
-        # Simple text search for each product code
+        automaton = None
+        if ahocorasick is not None:
+            # Multi-pattern automaton: one linear sweep over the XML finds
+            # every code, instead of one full scan per code
+            automaton = ahocorasick.Automaton()
+            for code in product_codes:
+                automaton.add_word(code, code)
+            automaton.make_automaton()
+
+        # Search the download chunk by chunk instead of materializing the
+        # whole XML; the carried-over tail catches codes split across chunks
+        code_bytes = [code.encode('utf-8') for code in product_codes]
+        overlap = max(len(raw) for raw in code_bytes) - 1
+        found = set()
+        tail = b''
+        for chunk in _iter_sitemap_chunks(first_sitemap_url):
+            window = tail + chunk
+            if automaton is not None:
+                found.update(code for _end, code
+                             in automaton.iter(window.decode('utf-8', 'replace')))
+            else:
+                for raw, code in zip(code_bytes, product_codes):
+                    if code not in found and raw in window:
+                        found.add(code)
+            tail = window[-overlap:] if overlap > 0 else b''
+
         found_count = 0
         not_found = []
-        
         for code in product_codes:
-            if code in xml_content:
+            if code in found:
                 found_count += 1
             else:
                 not_found.append(code)
@@ -788,26 +1420,42 @@ def main():
     all_product_data = []
     total_products = 0
     
-    # Process each product sitemap
+    # Download every product sitemap concurrently, then parse each in turn
+    sitemap_xml = asyncio.run(fetch_all_sitemaps(product_sitemaps))
+
+    # When an input code list exists, drop non-matching entries during the
+    # streaming parse instead of materializing every product first
+    wanted = input_codes_set if product_codes else None
+
+    # Paginated sitemaps can list the same product more than once; keep only
+    # the first occurrence of each code so it is fetched and translated once
+    seen_codes = set()
+
     for sitemap_url in product_sitemaps:
         print(f"Processing product sitemap: {sitemap_url}")
-        xml_content = fetch_sitemap(sitemap_url)
-        product_data = parse_product_sitemap(xml_content)
-        total_products += len(product_data)
-        all_product_data.extend(product_data)
-        print(f"  Extracted {len(product_data)} products")
+        product_data = parse_product_sitemap(sitemap_xml[sitemap_url], wanted=wanted)
+        added = 0
+        for product in product_data:
+            if product['code'] in seen_codes:
+                continue
+            seen_codes.add(product['code'])
+            all_product_data.append(product)
+            added += 1
+        total_products += added
+        print(f"  Extracted {added} matching products"
+              + (f" ({len(product_data) - added} duplicates skipped)"
+                 if added < len(product_data) else ""))
     
     # Filter products by code if necessary
     found_codes_set = set()
     if product_codes:
-        filtered_data = []
-        for product in all_product_data:
-            if product['code'] in product_codes:
-                filtered_data.append(product)
-                found_codes_set.add(product['code'])
-        
-        # Find missing codes
-        missing_codes = input_codes_set - found_codes_set
+        # Index by code once so filtering is pure set arithmetic
+        by_code = {product['code']: product for product in all_product_data}
+        found_codes_set = input_codes_set & by_code.keys()
+        missing_codes = input_codes_set - by_code.keys()
+        # Keep the input file's ordering for the output CSV
+        filtered_data = [by_code[code] for code in dict.fromkeys(product_codes)
+                         if code in by_code]
         
         print(f"\nFiltered to {len(filtered_data)} products matching your criteria")
         print(f"Found {len(found_codes_set)} out of {len(input_codes_set)} requested product codes")
@@ -833,99 +1481,42 @@ def main():
     else:
         filtered_data = all_product_data
     
-    # Process each product page and generate descriptions
-    enhanced_products = []
-    processed_count = 0
-    successful_count = 0
-    failed_count = 0
-    error_products = []
-    
     # Apply product limit if set
     products_to_process = filtered_data
     if MAX_PRODUCTS > 0 and len(filtered_data) > MAX_PRODUCTS:
         products_to_process = filtered_data[:MAX_PRODUCTS]
         print(f"Limiting processing to {MAX_PRODUCTS} products as specified in .env")
-    
+
+    # Skip products already written in a previous run, unless FORCE_MODE
+    # insists on reprocessing everything
+    done_codes = set() if FORCE_MODE else load_done_codes(OUTPUT_CSV)
+    if done_codes:
+        before_resume = len(products_to_process)
+        products_to_process = [p for p in products_to_process if p['code'] not in done_codes]
+        print(f"Resuming: skipping {before_resume - len(products_to_process)} products already in {OUTPUT_CSV}")
+
     total_to_process = len(products_to_process)
     print(f"\nProcessing {total_to_process} product pages to generate descriptions...")
-    
-    for i, product in enumerate(products_to_process):
-        try:
-            print(f"\n----- Processing product {i+1}/{total_to_process}: {product['code']} - {product['name']} -----")
-            
-            # Fetch product page content
-            html_content = fetch_product_page(product['product_url'])
 
-            if not html_content:
-                print(f"  Skipping product {product['code']} due to fetch error")
-                # Instead of skipping, add it with error message
-                enhanced_product = product.copy()
-                enhanced_product['english_description'] = "NOT FOUND - Could not fetch product page"
-                enhanced_product['spanish_description'] = "NOT FOUND - No se pudo obtener la página del producto"
-                enhanced_product['detailed_info'] = {"description": "", "specifications": {}, "items_in_set": [], "applications": []}
-                enhanced_products.append(enhanced_product)
-                processed_count += 1
-                failed_count += 1
-                error_products.append(f"{product['code']} - {product['name']} (fetch error)")
-                continue
-            
-            # Parse product page to extract detailed information
-            detailed_info = parse_product_page(html_content)
-            
-            # Create English description
-            english_description = create_product_description(product, detailed_info)
-            
-            # Translate to Spanish
-            print(f"  Translating description for product {product['code']}")
-            spanish_description = translate_to_spanish(english_description, product, detailed_info)
-            
-            # Check if there was an error in translation
-            if spanish_description.startswith("NOT FOUND"):
-                failed_count += 1
-                error_products.append(f"{product['code']} - {product['name']} (translation error)")
-            else:
-                successful_count += 1
-            
-            # Add to enhanced products
-            enhanced_product = product.copy()
-            enhanced_product['english_description'] = english_description
-            enhanced_product['spanish_description'] = spanish_description
-            enhanced_product['detailed_info'] = detailed_info
-            enhanced_products.append(enhanced_product)
-            
-            processed_count += 1
-            
-            # Add a small delay to avoid overloading the server and API
-            time.sleep(1)
-            
-        except Exception as e:
-            print(f"  Error processing product {product['code']}: {e}")
-            # Add the product with error message instead of skipping it
-            enhanced_product = product.copy()
-            enhanced_product['english_description'] = f"ERROR - {str(e)}"
-            enhanced_product['spanish_description'] = f"NOT FOUND - Error: {str(e)}"
-            enhanced_product['detailed_info'] = {"description": "", "specifications": {}, "items_in_set": [], "applications": []}
-            enhanced_products.append(enhanced_product)
-            processed_count += 1
-            failed_count += 1
-            error_products.append(f"{product['code']} - {product['name']} (processing error: {str(e)[:50]}...)")
-            continue
-    
-    # Write enhanced product data to CSV
-    if enhanced_products:
-        write_product_data_csv(enhanced_products, OUTPUT_CSV)
-    
+    # Run the fetch -> parse -> translate pipeline, streaming each finished
+    # row straight to the output CSV
+    out_file, csv_writer = open_product_csv(OUTPUT_CSV, append=bool(done_codes))
+    try:
+        stats = asyncio.run(process_products(products_to_process, csv_writer, out_file))
+    finally:
+        out_file.close()
+
     # Print final summary
     print("\n========== PROCESSING SUMMARY ==========")
     print(f"Total products in sitemap(s): {total_products}")
     print(f"Products matching criteria: {len(filtered_data)}")
-    print(f"Products processed: {processed_count}/{total_to_process}")
-    print(f"Successfully processed: {successful_count}")
-    print(f"Failed: {failed_count}")
-    
-    if failed_count > 0:
+    print(f"Products processed: {stats['processed']}/{total_to_process}")
+    print(f"Successfully processed: {stats['successful']}")
+    print(f"Failed: {stats['failed']}")
+
+    if stats['failed'] > 0:
         print("\nFailed products:")
-        for error_product in error_products:
+        for error_product in stats['errors']:
             print(f"  - {error_product}")
     
     print(f"\nProduct data written to {OUTPUT_CSV}")